@@ -20,6 +20,13 @@ from nanochat.flash_attention import flash_attn, HAS_FA3
 from nanochat.engine import KVCache
 
 
+@pytest.fixture(autouse=True)
+def fa_state(monkeypatch):
+    """Start every test on auto dispatch and restore fa_module state afterwards, even if the test fails."""
+    monkeypatch.setattr(fa_module, "_override_impl", None)
+    return monkeypatch
+
+
 def set_impl(impl):
     """Set the implementation override ('fa3', 'sdpa', or None for auto)."""
     fa_module._override_impl = impl
@@ -31,7 +38,6 @@ def run_both_impls(fn):
     out_fa3 = fn()
     set_impl('sdpa')
     out_sdpa = fn()
-    set_impl(None)  # reset
     return out_fa3, out_sdpa
 
 
@@ -228,11 +234,9 @@ class TestFA3VsSDPA:
             loss.backward()
             return y.detach(), q.grad.detach(), k.grad.detach(), v.grad.detach()
 
-        set_impl('fa3')
-        y_fa3, q_grad_fa3, k_grad_fa3, v_grad_fa3 = run()
-        set_impl('sdpa')
-        y_sdpa, q_grad_sdpa, k_grad_sdpa, v_grad_sdpa = run()
-        set_impl(None)
+        out_fa3, out_sdpa = run_both_impls(run)
+        y_fa3, q_grad_fa3, k_grad_fa3, v_grad_fa3 = out_fa3
+        y_sdpa, q_grad_sdpa, k_grad_sdpa, v_grad_sdpa = out_sdpa
 
         max_diff, mean_diff = assert_close(y_fa3, y_sdpa, "backward_output")
         print(f"backward_output: max_diff={max_diff:.6f}, mean_diff={mean_diff:.6f}")
@@ -268,7 +272,6 @@ class TestSDPAOnly:
 
         assert y.shape == (B, T, H, D)
         assert not torch.isnan(y).any(), "Output contains NaN"
-        set_impl(None)
 
     def test_backward(self):
         """Test gradients flow through SDPA."""
@@ -286,7 +289,6 @@ class TestSDPAOnly:
         assert k.grad is not None, "No gradient for k"
         assert v.grad is not None, "No gradient for v"
         assert not torch.isnan(q.grad).any(), "NaN in q gradient"
-        set_impl(None)
 
     def test_kvcache(self):
         """Test SDPA with KV cache."""
@@ -330,7 +332,6 @@ class TestSDPAOnly:
 
         assert y_single.shape == (B, 1, H, D)
         assert cache.get_pos() == T_prefill + 1
-        set_impl(None)
 
 
 # =============================================================================
@@ -344,17 +345,14 @@ class TestOverrideMechanism:
         """Test that override='fa3' uses FA3."""
         set_impl('fa3')
         assert fa_module._use_fa3() == True
-        set_impl(None)
 
     def test_override_sdpa(self):
         """Test that override='sdpa' uses SDPA."""
         set_impl('sdpa')
         assert fa_module._use_fa3() == False
-        set_impl(None)
 
     def test_override_auto(self):
         """Test that override=None uses auto-detection."""
-        set_impl(None)
         assert fa_module._use_fa3() == HAS_FA3
 
 
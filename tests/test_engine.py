@@ -5,6 +5,7 @@ python -m pytest tests/test_engine.py -v
 """
 
 import torch
+import pytest
 from nanochat.engine import KVCache, Engine
 from dataclasses import dataclass
 
@@ -81,7 +82,8 @@ class ByteTokenizer:
         byte_tokens = [t for t in tokens if t < 256]
         return bytes(byte_tokens).decode("utf-8", errors="replace")
 
-def test_kv_cache_basic():
+@pytest.mark.parametrize("dtype", [torch.float32, torch.bfloat16])
+def test_kv_cache_basic(dtype):
     """Test basic KVCache functionality for FA3."""
     batch_size = 2
     num_heads = 3
@@ -96,13 +98,15 @@ def test_kv_cache_basic():
         head_dim=head_dim,
         num_layers=num_layers,
         device="cpu",
-        dtype=torch.float32,
+        dtype=dtype,
     )
 
     # Check initial state
     assert kv_cache.get_pos() == 0
     assert kv_cache.k_cache.shape == (num_layers, batch_size, seq_len, num_heads, head_dim)
     assert kv_cache.v_cache.shape == (num_layers, batch_size, seq_len, num_heads, head_dim)
+    assert kv_cache.k_cache.dtype == dtype and kv_cache.v_cache.dtype == dtype
+    assert kv_cache.cache_seqlens.dtype == torch.int32 # positions stay int32 regardless of cache dtype
 
     # Test advance
     kv_cache.advance(10)
@@ -121,7 +125,8 @@ def test_kv_cache_basic():
     assert v_layer0.shape == (batch_size, seq_len, num_heads, head_dim)
 
 
-def test_kv_cache_prefill():
+@pytest.mark.parametrize("dtype", [torch.float32, torch.bfloat16])
+def test_kv_cache_prefill(dtype):
     """Test KVCache.prefill() copies data correctly."""
     batch_size = 1
     num_heads = 4
@@ -131,7 +136,7 @@ def test_kv_cache_prefill():
     # Create source cache and advance it
     src_cache = KVCache(
         batch_size=batch_size, num_heads=num_heads, seq_len=32,
-        head_dim=head_dim, num_layers=num_layers, device="cpu", dtype=torch.float32,
+        head_dim=head_dim, num_layers=num_layers, device="cpu", dtype=dtype,
     )
     # Write some data to source cache
     src_cache.k_cache[0, 0, :16, :, :] = 1.0
@@ -141,7 +146,7 @@ def test_kv_cache_prefill():
     # Create destination cache with larger seq_len
     dst_cache = KVCache(
         batch_size=batch_size, num_heads=num_heads, seq_len=64,
-        head_dim=head_dim, num_layers=num_layers, device="cpu", dtype=torch.float32,
+        head_dim=head_dim, num_layers=num_layers, device="cpu", dtype=dtype,
     )
 
     # Prefill